@@ -6,26 +6,50 @@ Run as python geotraf.py
 Author: Max Mahlke
 '''
 
+import collections
 from datetime import datetime
+import functools
+import importlib
+import ipaddress
+import os
+import queue
 import socket
 import struct
 import sys
-import urllib
-from urllib.request  import urlopen
+import threading
+import time
 
-import dpkt
 import geoip2.database
-from matplotlib.figure import Figure
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
 plt.rcParams['keymap.pan'] = ''  # disable default keyboard shortcuts for 'l', 'q', and 'p'
 plt.rcParams['keymap.yscale'] = ''
 plt.rcParams['keymap.quit'] = ''
-from mpl_toolkits.basemap import Basemap
 import numpy as np
 import pcap
 
 
+BROADCAST = 0xFFFFFFFF  # 255.255.255.255
+ETHERTYPE_IP = 0x0800
+# Ether type at bytes 12:14, source IP at 26:30, destination IP at 30:34 of ethernet frame
+ETH_IP_HEADER = struct.Struct('!12xH12xII')
+GRID_STEP = 0.25  # degrees, resolution of looked-up coordinates
+GREAT_CIRCLE_STEPS = np.linspace(0, 1, 40)  # interpolation points of connection lines
+ANTIPODAL = -1 + 1e-9  # cosine of angle below which locations count as antipodal
+BATCH_SIZE = 64  # packets handed over per dispatch call and drawn per animation frame
+FLOW_WINDOW = 1.  # seconds in which repeated packets of a flow are not displayed again
+LOG_ROW = '{0: <21}{1: <17}{2: <17}{3: <17}{4: <17}{5: <17}{6: <17}'  # time and connection properties
+FADE_STEP = 0.02  # opacity lost by connection lines per animation frame
+IP_CACHE = os.path.expanduser('~/.cache/geotraf_ip')  # last retrieved public IP
+IP_CACHE_TTL = 3600  # seconds
+SKIP = 3  # traffic kind which is not displayed, e.g. local source and destination
+PRIVATE_NETWORKS = ('10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16')
+PRIVATE_NETS = '(%s)' % ' or '.join(PRIVATE_NETWORKS)
+
+# BPF expression passing IP packets with at least one external endpoint
+CAPTURE_FILTER = ('ip and not host 255.255.255.255 and not (src net %s and dst net %s)'
+                  % (PRIVATE_NETS, PRIVATE_NETS))
+
 
 class TrafficDisplay:
     '''
@@ -51,39 +75,54 @@ class TrafficDisplay:
         self.my_city = my_city
         self.my_country = my_country
 
-        self.connections = dict()  # dict to hold recent connections
+        # Unit vector of own location, end point of all connection lines
+        self.my_xyz = lat_lon_to_xyz(my_lat, my_lon)
+
+        self.connections = collections.OrderedDict()  # dict to hold recent connections as log rows, oldest first
+        self.recent_flows = collections.OrderedDict()  # last display time of (source, destination) pairs, oldest first
+        self.lines = collections.deque()  # connection lines currently on map, oldest first
+
+        # Display functions indexed by traffic kind, see classify. Only a local
+        # source with external destination is outgoing traffic, the rest is incoming
+        self.handlers = (self._draw_incoming, self._draw_outgoing, self._draw_incoming)
 
-        # Turn on interactive mode
-        plt.ion()
+        # Cache geoip look-ups per IP, including misses, so that repeated
+        # connections do not query the database again
+        self.lookup = functools.lru_cache(maxsize=4096)(self._lookup)
+        # Cache projected great circles per location
+        self.great_circle_xy = functools.lru_cache(maxsize=1024)(self._great_circle_xy)
 
-        # Create figure
+        # Create figure. Interactive mode stays off, otherwise every added or removed
+        # connection line triggers a full redraw of the map and defeats the blitting
         self.fig = plt.figure(figsize=(9, 6))
         self.ax = self.fig.add_axes([0, 0, 1, 1])
 
         print('\n\nControls\n--------\nq - exit\np - save screenshot\nl - print recent conncetions to console')
 
         # ------
+        # Basemap is imported lazily, see main
+        from mpl_toolkits.basemap import Basemap
+
         # Use Mercator projection, see https://matplotlib.org/basemap/users/examples.html
         self.traffic_map = Basemap(llcrnrlat=-61.9, urcrnrlat=84, projection='merc',
                                    llcrnrlon=-180, urcrnrlon=180, lat_ts=20,
                                    resolution='l')
         self.traffic_map.drawcoastlines()
         self.traffic_map.fillcontinents(color='lightgray')
+        # Keep map extent fixed when connection lines are plotted
+        self.ax.set_autoscale_on(False)
+        # Empty line which is always redrawn. FuncAnimation falls back to redrawing the
+        # whole figure if the draw tick returns no artists, i.e. no connection is shown
+        self.blit_anchor, = self.ax.plot([], [], animated=True)
         self.fig.canvas.mpl_connect('key_press_event', self.pressed_key)
 
-        self.fig.show()
-
 
     def pressed_key(self, event):
         if event.key == 'l':
-            print('\n{0: <21}{1: <17}{2: <17}{3: <17}{4: <17}{5: <17}{6: <17}'.format('Time', 'Source IP', 'Dest IP', 'Source City', \
-                                                                                    'Source Country', 'Dest City', 'Dest Country'))
-            for timestamp, props in self.connections.items():
-                time = datetime.utcfromtimestamp(int(timestamp)).strftime('%Y-%m-%d %H:%M:%S')
-                try:
-                    print('{0: <21}{1: <17}{2: <17}{3: <17}{4: <17}{5: <17}{6: <17}'.format(time, *props))
-                except TypeError:
-                    pass
+            print('\n' + LOG_ROW.format('Time', 'Source IP', 'Dest IP', 'Source City',
+                                        'Source Country', 'Dest City', 'Dest Country'))
+            for row in self.connections.values():
+                print(row)
             print('\n')
         elif event.key == 'q':
             plt.close(event.canvas.figure)
@@ -93,116 +132,413 @@ class TrafficDisplay:
             print('Saved screenshot to CWD')
 
 
+    def _lookup(self, ip):
+        '''
+        Look up location of IP address in geoip2 database
+
+        params
+        ------
+        ip - string, IP address in decimal format
+
+        returns
+        ------
+        tuple of latitude, longitude, city, country or None if IP was not located.
+        Coordinates are rounded to multiples of GRID_STEP
+        '''
+        try:
+            response = self.reader.city(ip)
+        except geoip2.errors.AddressNotFoundError:
+            return None
+        if response.location.latitude is None or response.location.longitude is None:
+            return None
+
+        # Geolocation is city-level at best, quantize coordinates so that nearby
+        # locations share the cached great circles
+        return (round(response.location.latitude / GRID_STEP) * GRID_STEP,
+                round(response.location.longitude / GRID_STEP) * GRID_STEP,
+                response.city.name, response.country.name)
+
+
+    def _great_circle_xy(self, lat, lon):
+        '''
+        Compute great circle from remote location to own location in map coordinates
+
+        params
+        ------
+        lat - float, latitude of remote location in degrees
+        lon - float, longitude of remote location in degrees
+
+        returns
+        ------
+        x, y - arrays, map coordinates of points along the great circle
+        '''
+
+        # Interpolate between the two unit vectors along the sphere
+        xyz = lat_lon_to_xyz(lat, lon)
+        if np.dot(xyz, self.my_xyz) > ANTIPODAL:
+            points = slerp(xyz, self.my_xyz)
+        else:
+            # Great circle is not unique for (nearly) antipodal locations. Route through
+            # a point 90deg away from both, on the equator unless they are at the poles
+            mid = np.cross(xyz, [0, 0, 1]) if abs(xyz[2]) < 0.9 else np.cross(xyz, [1, 0, 0])
+            mid /= np.linalg.norm(mid)
+            points = np.concatenate([slerp(xyz, mid), slerp(mid, self.my_xyz)[1:]])
+
+        lats = np.degrees(np.arcsin(np.clip(points[:, 2], -1, 1)))
+        lons = np.degrees(np.arctan2(points[:, 1], points[:, 0]))
+
+        # Break line where it crosses the map boundary at +-180deg longitude
+        jumps = np.nonzero(np.abs(np.diff(lons)) > 180)[0] + 1
+        lats = np.insert(lats, jumps, np.nan)
+        lons = np.insert(lons, jumps, np.nan)
+
+        return self.traffic_map(lons, lats)
+
+
     def sniff_and_animate(self):
         # ------
-        # Initiate packet sniffer
+        # Initiate packet sniffer. On Linux, libpcap >= 1.5 already reads
+        # from a memory-mapped TPACKET_V3 ring, no need for a custom AF_PACKET socket
         self.sniffer = pcap.pcap(name=None, immediate=True)
 
+        # Let the kernel drop non-IP, broadcast and local-to-local packets
+        # before they are copied to userspace
+        self.sniffer.setfilter(CAPTURE_FILTER)
+
         # ------
-        # Iterate over traffic in buffer. Display IP packets on world map
-        for timestamp, raw_buffer in self.sniffer:
-
-            packet = {}
-
-            # Unpack ethernet frame into
-            # mac src, mac dst, ether type
-            eth = dpkt.ethernet.Ethernet(raw_buffer)
-            packet['eth'] = {'src': eth.src, 'dst': eth.dst, 'type':eth.type}
-
-            # Ensure the packet is IP
-            if not isinstance(eth.data, dpkt.ip.IP):
-                continue
-
-            # Extract ip packet
-            ip_packet = eth.data
-
-            # Extract parts of interest from packet
-            # source IP, destination IP, protocol
-            packet['ip'] = {'src':ip_packet.src ,
-                            'dst':ip_packet.dst, 'p': ip_packet.p}
-
-            # Convert IP addresses from byte to raw decimal strings
-            source = byte_to_str(ip_packet.src)
-            dest = byte_to_str(ip_packet.dst)
-
-            # ------
-            # Filter out broadcast messages and private traffic
-            if source != '255.255.255.255' and dest != '255.255.255.255':
-                if source.startswith(('192.168.','10.','172.16.','172.31.')):
-                    if dest.startswith(('192.168.','10.','172.16.','172.31.')):
-                        continue  # local connections
-                    else:
-                        # Source is local but destination is external -> outgoing traffic
-                        try:
-                            # Look up destination coordinates
-                            response = self.reader.city(dest)
-                            dst_lat = response.location.latitude
-                            dst_lon = response.location.longitude
-                            # Plot connection
-                            line, = self.traffic_map.drawgreatcircle(dst_lon, dst_lat, self.my_lon, self.my_lat,
-                            linewidth=2, color='r', alpha=0.5)
-
-                            # Add connection to log
-                            self.connections[timestamp] = [source, dest, self.my_city, self.my_country, \
-                                                           response.city.name, response.country.name]
-                        except geoip2.errors.AddressNotFoundError:
-                            # If the IP address was not found in the database go to next connection
-                            continue
-                else:
-                    # Source is not local IP, so it is incoming traffic
-                    try:
-                        # Look up source coordinates
-                        response = self.reader.city(source)
-                        src_lat = response.location.latitude
-                        src_lon = response.location.longitude
-                        # Plot connection
-                        line, = self.traffic_map.drawgreatcircle(src_lon, src_lat, self.my_lon, self.my_lat,
-                                                         linewidth=2, color='g', alpha=0.5)
-                        # Add connection to log
-                        self.connections[timestamp] = [source, dest, response.city.name, response.country.name, \
-                                                       self.my_city, self.my_country]
-
-                    except geoip2.errors.AddressNotFoundError:
-                        continue
-
-            # ------
-            # Reduce opacity older connections to get vanishing animation
-            for connection in self.ax.get_children():
-                # Check that line is  visible
-                # Basemap lines have alpha=None
-                if connection.get_alpha():
-                    if connection.get_alpha() > 0.1:
-                        reduced_alpha = connection.get_alpha() - 0.1
-                        connection.set_alpha(reduced_alpha)
-                    else:
-                        # If the line's opacity is close to zero, remove it from plot to
-                        # release memory
-                        connection.remove()
+        # Sniff in background thread so that slow look-ups and drawing
+        # do not stall the capture. Packets are passed on through a bounded queue
+        self.packets = queue.Queue(maxsize=256)
+        self.sniff_error = None  # set by sniffer thread if capture fails
+        self.sniff_thread = threading.Thread(target=self._sniff_loop, daemon=True)
+        self.sniff_thread.start()
+
+        # ------
+        # Drain queue periodically on GUI thread. Display IP packets on world map
+        # Blitting restores the cached background of coastlines and continents and
+        # redraws only the connection lines returned by the draw tick
+        self.animation = animation.FuncAnimation(self.fig, self._draw_tick, interval=50,
+                                                 blit=True, cache_frame_data=False)
+        plt.show(block=True)
+
+        if self.sniff_error is not None:
+            sys.exit(1)
+
+
+    def _sniff_loop(self):
+        '''
+        Hand traffic in buffer to callback in bursts. Runs in background thread
+        '''
+        try:
+            while True:
+                self.sniffer.dispatch(BATCH_SIZE, self._on_packet)
+        except OSError as error:
+            # E.g. interface went down. Reported on GUI thread, see _draw_tick
+            self.sniff_error = error
+
+
+    def _on_packet(self, timestamp, raw_buffer):
+        '''
+        Queue a single captured packet for display
+
+        params
+        ------
+        timestamp - float, capture time of packet
+        raw_buffer - bytes, raw ethernet frame
+        '''
+
+        kind, src_u32, dst_u32 = classify(raw_buffer)
+        if kind == SKIP:
+            return
+
+        # Skip packets of flows which were displayed within the last FLOW_WINDOW seconds
+        flow = (src_u32, dst_u32)
+        if timestamp - self.recent_flows.get(flow, 0) < FLOW_WINDOW:
+            return
+
+        try:
+            self.packets.put_nowait((timestamp, kind, src_u32, dst_u32))
+        except queue.Full:
+            # Display cannot keep up, drop packet
+            return
+
+        self.recent_flows[flow] = timestamp
+        self.recent_flows.move_to_end(flow)
+
+        # Forget flows outside of the window, ends at the flow just displayed
+        while True:
+            oldest, last = next(iter(self.recent_flows.items()))
+            if timestamp - last < FLOW_WINDOW:
+                break
+            del self.recent_flows[oldest]
+
+
+    def _log_connection(self, timestamp, *props):
+        '''
+        Add connection to log of recent connections, formatted for printing
+
+        params
+        ------
+        timestamp - float, capture time of packet
+        props - strings, source IP, dest IP, source city, source country, dest city, dest country
+        '''
+
+        time_str = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp))
+        try:
+            self.connections[timestamp] = LOG_ROW.format(time_str, *props)
+        except TypeError:
+            pass  # city or country unknown
+
+
+    def _draw_outgoing(self, timestamp, source, dest):
+        '''
+        Display connection from local source to external destination
+
+        params
+        ------
+        timestamp - float, capture time of packet
+        source - string, source IP address in decimal format
+        dest - string, destination IP address in decimal format
+        '''
+
+        # Look up destination coordinates
+        location = self.lookup(dest)
+        # If the IP address was not found in the database go to next connection
+        if location is None:
+            return
+        dst_lat, dst_lon, dst_city, dst_country = location
+        # Plot connection
+        x, y = self.great_circle_xy(dst_lat, dst_lon)
+        line, = self.ax.plot(x, y, linewidth=2, color='r', alpha=0.5, animated=True)
+        self.lines.append(line)
+
+        # Add connection to log
+        self._log_connection(timestamp, source, dest, self.my_city, self.my_country,
+                             dst_city, dst_country)
+
+
+    def _draw_incoming(self, timestamp, source, dest):
+        '''
+        Display connection from external source
+
+        params
+        ------
+        timestamp - float, capture time of packet
+        source - string, source IP address in decimal format
+        dest - string, destination IP address in decimal format
+        '''
+
+        # Look up source coordinates
+        location = self.lookup(source)
+        if location is None:
+            return
+        src_lat, src_lon, src_city, src_country = location
+        # Plot connection
+        x, y = self.great_circle_xy(src_lat, src_lon)
+        line, = self.ax.plot(x, y, linewidth=2, color='g', alpha=0.5, animated=True)
+        self.lines.append(line)
+        # Add connection to log
+        self._log_connection(timestamp, source, dest, src_city, src_country,
+                             self.my_city, self.my_country)
+
+
+    def _draw_tick(self, frame):
+        '''
+        Display queued packets on world map and fade out older connections
+
+        params
+        ------
+        frame - int, frame number passed by FuncAnimation
+
+        returns
+        ------
+        list of connection lines to redraw, never empty
+        '''
+
+        # Stop animation if the sniffer thread died
+        if self.sniff_error is not None:
+            print('\nPacket capture failed: %s. Exiting.\n' % self.sniff_error)
+            plt.close(self.fig)
+
+        for _ in range(BATCH_SIZE):
+            try:
+                timestamp, kind, src, dst = self.packets.get_nowait()
+            except queue.Empty:
+                break
+
+            # Convert IP addresses from integers to raw decimal strings and display
+            # connection according to traffic direction
+            self.handlers[kind](timestamp, u32_to_str(src), u32_to_str(dst))
 
             # Make sure that size of connections dict does not exceed limit of 100
-            if len(self.connections.keys()) > 100:
-                # Find oldest logged connection
-                del self.connections[min(self.connections.keys())]
+            if len(self.connections) > 100:
+                # Remove oldest logged connection
+                self.connections.popitem(last=False)
+
+        # ------
+        # Reduce opacity older connections to get vanishing animation
+        # Lines are faded at the same rate, so the oldest line is always the faintest
+        while self.lines and self.lines[0].get_alpha() <= FADE_STEP:
+            # If the line's opacity is close to zero, remove it from plot to
+            # release memory
+            self.lines.popleft().remove()
+        for line in self.lines:
+            line.set_alpha(line.get_alpha() - FADE_STEP)
+
+        return [self.blit_anchor, *self.lines]
+
+
+def u32_to_str(adr):
+    '''
+     Helper function to convert integer addresses to decimal format
+
+     params
+     ------
+     adr - int, IP address as unsigned 32-bit integer
+
+     returns
+     ------
+     string, IP address in decimal format
+    '''
 
-            # Update plot
-            self.fig.canvas.flush_events()
+    return socket.inet_ntoa(struct.pack('!I', adr))
 
 
-def byte_to_str(adr):
+def classify(raw_buffer):
     '''
-     Helper function to convert byte addresses to decimal format
+     Helper function to classify ethernet frame by direction of traffic
 
      params
      ------
-     adr - byte string
+     raw_buffer - bytes, raw ethernet frame
 
      returns
      ------
-     return_ip - string, IP address in decimal format
+     kind - int, bit 0 set if source is local, bit 1 if destination is local.
+            SKIP for local connections, broadcast messages and non-IP frames
+     src_u32 - int, source IP address as unsigned 32-bit integer
+     dst_u32 - int, destination IP address as unsigned 32-bit integer
     '''
 
-    return_ip = '.'.join([str(int.from_bytes([i], 'big')) for i in adr])
-    return return_ip
+    # Unpack ether type and source and destination IP from header
+    # without parsing the whole frame
+    if len(raw_buffer) < ETH_IP_HEADER.size:
+        return SKIP, 0, 0
+    ether_type, src_u32, dst_u32 = ETH_IP_HEADER.unpack_from(raw_buffer)
+
+    # Ensure the packet is IP and filter out broadcast messages
+    if ether_type != ETHERTYPE_IP or src_u32 == BROADCAST or dst_u32 == BROADCAST:
+        return SKIP, src_u32, dst_u32
+
+    # Local connections end up as SKIP
+    return is_local(src_u32) | is_local(dst_u32) << 1, src_u32, dst_u32
+
+
+def is_local(adr):
+    '''
+     Helper function to check if address is in a private network,
+     i.e. 10.0.0.0/8, 172.16.0.0/12 or 192.168.0.0/16
+
+     params
+     ------
+     adr - int, IP address as unsigned 32-bit integer
+
+     returns
+     ------
+     bool, True if address is private
+    '''
+
+    return ((adr & 0xFF000000) == 0x0A000000 or
+            (adr & 0xFFF00000) == 0xAC100000 or
+            (adr & 0xFFFF0000) == 0xC0A80000)
+
+
+# is_local is unrolled for speed, make sure it covers exactly PRIVATE_NETWORKS
+for _net in map(ipaddress.ip_network, PRIVATE_NETWORKS):
+    _first, _last = int(_net.network_address), int(_net.broadcast_address)
+    assert is_local(_first) and is_local(_last)
+    assert not is_local(_first - 1) and not is_local(_last + 1)
+
+
+def lat_lon_to_xyz(lat, lon):
+    '''
+     Helper function to convert geographic coordinates to unit vector
+
+     params
+     ------
+     lat - float, latitude in degrees
+     lon - float, longitude in degrees
+
+     returns
+     ------
+     array, cartesian coordinates on unit sphere
+    '''
+
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def slerp(start, end):
+    '''
+     Helper function to interpolate between unit vectors along great circle
+
+     params
+     ------
+     start - array, cartesian coordinates of start point on unit sphere
+     end - array, cartesian coordinates of end point on unit sphere
+
+     returns
+     ------
+     array, cartesian coordinates of GREAT_CIRCLE_STEPS points on unit sphere
+    '''
+
+    omega = np.arccos(np.clip(np.dot(start, end), -1, 1))
+    if omega < 1e-6:
+        return np.array([start, end])
+    t = GREAT_CIRCLE_STEPS[:, np.newaxis]
+    return (np.sin((1 - t) * omega) * start + np.sin(t * omega) * end) / np.sin(omega)
+
+
+def fetch_public_ip():
+    '''
+     Helper function to request public IP address from ip.42.pl. The address
+     is cached in IP_CACHE and reused for IP_CACHE_TTL seconds
+
+     returns
+     ------
+     my_ip - string, public IP address in decimal format
+    '''
+
+    try:
+        if time.time() - os.path.getmtime(IP_CACHE) < IP_CACHE_TTL:
+            with open(IP_CACHE) as cache:
+                return str(ipaddress.ip_address(cache.read().strip()))
+    except (OSError, ValueError):
+        pass  # no valid cached address
+
+    # Plain HTTP/1.0 request, the server closes the connection after the response.
+    # Redirects are not followed
+    with socket.create_connection(('ip.42.pl', 80), timeout=3) as connection:
+        connection.sendall(b'GET /raw HTTP/1.0\r\nHost: ip.42.pl\r\n\r\n')
+        response = b''.join(iter(lambda: connection.recv(4096), b''))
+
+    header, _, body = response.partition(b'\r\n\r\n')
+    status = header.split(None, 2)
+    if len(status) < 2 or status[1] != b'200':
+        raise OSError('Unexpected response from ip.42.pl')
+    # Reject anything but an address, e.g. the login page of a captive portal
+    try:
+        my_ip = str(ipaddress.ip_address(body.decode('ascii').strip()))
+    except ValueError:  # includes UnicodeDecodeError
+        raise OSError('Unexpected response from ip.42.pl')
+
+    try:
+        os.makedirs(os.path.dirname(IP_CACHE), exist_ok=True)
+        with open(IP_CACHE, 'w') as cache:
+            cache.write(my_ip)
+    except OSError:
+        pass  # caching is optional
+    return my_ip
 
 
 def retrieve_ip_and_location(reader):
@@ -226,9 +562,9 @@ def retrieve_ip_and_location(reader):
     sys.stdout.write('\nRetrieving IP address..'.ljust(29))
     # Retrieve public IP
     try:
-        my_ip = urlopen('http://ip.42.pl/raw', timeout=3).read().decode('utf-8')
+        my_ip = fetch_public_ip()
         sys.stdout.write(my_ip)
-    except urllib.error.URLError:
+    except OSError:
         sys.stdout.write('error\nCould not retrieve IP. Is the computer connected to the Internet?\n\n')
         sys.exit()
 
@@ -246,9 +582,17 @@ def retrieve_ip_and_location(reader):
 
 
 def main():
+    # ------
+    # Import Basemap in background, overlapping with loading the database and
+    # retrieving the public IP. The import in TrafficDisplay waits for it to finish
+    threading.Thread(target=importlib.import_module, args=('mpl_toolkits.basemap',),
+                     daemon=True).start()
+
     # ------
     # Start by retrieving public IP and looking up own coordinates
     # Requires database GeoLite2-City.mmdb to be present in CWD
+    # The default mode uses the mmap reader of the libmaxminddb C extension if
+    # installed. MODE_MEMORY would switch to the much slower pure Python reader
     try:
         reader = geoip2.database.Reader('GeoLite2-City.mmdb')
     except FileNotFoundError: